@@ -1,10 +1,22 @@
 import streamlit as st
-import pandas as pd
+import functools
 import json
+import re
+import sqlite3
 import hashlib
-from datetime import datetime, date
+import base64
+import secrets
+import os
+import time
+from dataclasses import dataclass, asdict, replace
+from datetime import date
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Page configuration
 st.set_page_config(
     page_title="Job Application Tracker",
@@ -16,6 +28,10 @@ st.set_page_config(
 DATA_DIR = Path(__file__).parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 USERS_FILE = DATA_DIR / "users.json"
+DB_FILE = DATA_DIR / "jobs.db"
+
+# Record keys, in the order the jobs table stores them
+JOB_COLUMNS = ("Company Name", "Job Title", "Status", "Applied Date", "Package")
 
 # Status options for dropdown
 STATUS_OPTIONS = [
@@ -27,101 +43,223 @@ STATUS_OPTIONS = [
     "Withdrawn"
 ]
 
-# Custom CSS for styling
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        font-weight: 700;
-        color: #1E3A5F;
-        text-align: center;
-        margin-bottom: 1rem;
-    }
-    .sub-header {
-        font-size: 1.1rem;
-        color: #666;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .login-container {
-        max-width: 400px;
-        margin: 0 auto;
-        padding: 2rem;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        border-radius: 20px;
-        box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-    }
-    .login-header {
-        font-size: 2rem;
-        font-weight: 700;
-        color: white;
-        text-align: center;
-        margin-bottom: 1.5rem;
-    }
-    .stDataFrame {
-        border-radius: 10px;
-    }
-    div[data-testid="stForm"] {
-        background-color: #f8f9fa;
-        padding: 1.5rem;
-        border-radius: 10px;
-        border: 1px solid #e9ecef;
-    }
-    .welcome-banner {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 1rem 2rem;
-        border-radius: 10px;
-        color: white;
-        margin-bottom: 1rem;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-
-def hash_password(password):
-    """Hash password for storage."""
-    return hashlib.sha256(password.encode()).hexdigest()
+# Custom CSS for styling, read and minified once at import
+_CSS = "<style>" + re.sub(r"\s+", " ", Path(__file__).with_name("style.css").read_text()) + "</style>"
+
+
+@st.cache_resource
+def _inject_css():
+    """Emit the style block once; cache replay re-renders it on later runs."""
+    st.markdown(_CSS, unsafe_allow_html=True)
+
+
+def json_loads(data):
+    """Parse JSON text or bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(slots=True, frozen=True)
+class User:
+    """A stored account; slots keep per-instance memory to the three strings."""
+    password: str
+    display_name: str
+    created_at: float  # epoch seconds; legacy records may carry an ISO string
+    salt: str = ""  # empty for legacy unsalted SHA-256 records
+
+
+@functools.lru_cache(maxsize=4)
+def _derive_scrypt(password, salt_hex):
+    """Memoized scrypt derivation so rerun-driven retries don't re-pay the KDF cost."""
+    salt = bytes.fromhex(salt_hex)
+    return hashlib.scrypt(password.encode(), salt=salt, n=2**14, r=8, p=1, dklen=32).hex()
+
+
+def hash_password(password, salt):
+    """Derive a salted password hash with scrypt (runs in OpenSSL's C implementation)."""
+    return _derive_scrypt(password, salt.hex())
+
+
+def verify_password(password, user):
+    """Check a password against a stored user, including pre-scrypt records."""
+    if user.salt:
+        return user.password == hash_password(password, base64.b64decode(user.salt))
+    # Legacy records: unsalted SHA-256
+    return user.password == hashlib.sha256(password.encode()).hexdigest()
+
+
+@st.cache_data(show_spinner=False)
+def _load_users_cached(path, mtime_ns):
+    """Parse the users file into User records; cached until the file's mtime changes."""
+    with open(path, "rb") as f:
+        return {name: User(**rec) for name, rec in json_loads(f.read()).items()}
 
 
 def load_users():
     """Load users from JSON file."""
     if USERS_FILE.exists():
-        with open(USERS_FILE, "r") as f:
-            return json.load(f)
+        mtime_ns = os.stat(USERS_FILE).st_mtime_ns
+        return _load_users_cached(str(USERS_FILE), mtime_ns)
     return {}
 
 
 def save_users(users):
-    """Save users to JSON file."""
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=2)
+    """Save the user registry to JSON file."""
+    if orjson is not None:
+        # orjson serializes dataclasses natively, no per-record asdict()
+        payload = orjson.dumps(users, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_DATACLASS)
+    else:
+        payload = json.dumps({name: asdict(user) for name, user in users.items()}, indent=2).encode()
+    _write_payload(USERS_FILE, payload)
+
+
+@st.cache_resource
+def get_db():
+    """Open the shared SQLite connection, creating the schema on first use."""
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS jobs ("
+        "user TEXT NOT NULL, "
+        "company TEXT NOT NULL, "
+        "title TEXT NOT NULL, "
+        "status TEXT NOT NULL, "
+        "applied_date TEXT, "
+        "package TEXT)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_user_status ON jobs (user, status)")
+    # WAL + NORMAL sync: durable enough without an fsync per write
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
 
 
-def get_user_data_file(username):
-    """Get the data file path for a specific user."""
-    return DATA_DIR / f"jobs_{username}.json"
+def migrate_legacy_data(username):
+    """One-time import of a user's old jobs_<user>.jsonl/.json file into SQLite."""
+    jsonl_file = DATA_DIR / f"jobs_{username}.jsonl"
+    json_file = DATA_DIR / f"jobs_{username}.json"
+    if not jsonl_file.exists() and not json_file.exists():
+        return
+    if jsonl_file.exists():
+        with open(jsonl_file, "rb") as f:
+            records = [json_loads(line) for line in f if line.strip()]
+    else:
+        with open(json_file, "rb") as f:
+            records = json_loads(f.read())
+    if records:
+        save_data(username, records)
+    jsonl_file.unlink(missing_ok=True)
+    json_file.unlink(missing_ok=True)
 
 
 def load_data(username):
-    """Load job applications for a specific user."""
-    data_file = get_user_data_file(username)
-    if data_file.exists():
-        with open(data_file, "r") as f:
-            data = json.load(f)
-            if data:
-                df = pd.DataFrame(data)
-                df["Applied Date"] = pd.to_datetime(df["Applied Date"]).dt.date
-                return df
-    return pd.DataFrame(columns=["Company Name", "Job Title", "Status", "Applied Date", "Package"])
-
-
-def save_data(username, df):
-    """Save job applications for a specific user."""
-    data_file = get_user_data_file(username)
-    data = df.copy()
-    data["Applied Date"] = data["Applied Date"].astype(str)
-    with open(data_file, "w") as f:
-        json.dump(data.to_dict(orient="records"), f, indent=2)
+    """Load job applications for a specific user as a list of record dicts."""
+    migrate_legacy_data(username)
+    rows = get_db().execute(
+        "SELECT company, title, status, applied_date, package FROM jobs WHERE user = ? ORDER BY rowid",
+        (username,)
+    ).fetchall()
+    return [dict(zip(JOB_COLUMNS, row)) for row in rows]
+
+
+def normalize_record(row):
+    """Coerce a record's Applied Date to an ISO string for storage."""
+    applied = row.get("Applied Date")
+    if isinstance(applied, date):
+        row = {**row, "Applied Date": applied.isoformat()}
+    return row
+
+
+def display_date(value):
+    """Parse a stored date string for the editor's DateColumn; dates may be NULL."""
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _write_payload(path, payload):
+    """Write a fully serialized payload in one call.
+
+    Serialization happens before the file is opened, so each save issues a
+    single write. This is also the seam where a multi-tenant deployment could
+    queue payloads and submit them asynchronously instead of writing inline.
+    """
+    with open(path, "wb") as f:
+        f.write(payload)
+
+
+def save_data(username, records):
+    """Replace a user's rows wholesale; only for edits and clears, not the add path."""
+    # Generator feeds executemany one row at a time; no intermediate tuple list
+    rows = (
+        (username, *(normalize_record(r)[col] for col in JOB_COLUMNS))
+        for r in records
+    )
+    conn = get_db()
+    with conn:
+        conn.execute("DELETE FROM jobs WHERE user = ?", (username,))
+        conn.executemany("INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+def clear_data(username):
+    """Delete all of a user's applications in one statement."""
+    conn = get_db()
+    with conn:
+        conn.execute("DELETE FROM jobs WHERE user = ?", (username,))
+
+
+@st.cache_data(show_spinner=False)
+def _status_counts(username, version):
+    """Per-status application counts; recomputed only when the user's data version bumps."""
+    rows = get_db().execute(
+        "SELECT status, COUNT(*) FROM jobs WHERE user = ? GROUP BY status",
+        (username,)
+    ).fetchall()
+    return dict(rows)
+
+
+def _search_blobs():
+    """Lowercased company+title per record, aligned with jobs_records.
+
+    Cached in session state keyed on jobs_version — the blobs must track this
+    session's records exactly, and a process-global st.cache_data entry could
+    be shared between two sessions of the same user whose per-session version
+    counters collide on different data. Recomputed only when the version
+    bumps, so a keystroke pays one C-level substring check per record instead
+    of two .lower() allocations per record per rerun.
+    """
+    version = st.session_state.jobs_version
+    cached = st.session_state.get("search_blobs_cache")
+    if cached is None or cached[0] != version:
+        blobs = [
+            (r["Company Name"] + "\x1f" + r["Job Title"]).lower()
+            for r in st.session_state.jobs_records
+        ]
+        st.session_state.search_blobs_cache = (version, blobs)
+        return blobs
+    return cached[1]
+
+
+@st.cache_data(show_spinner=False)
+def _export_csv(username, version):
+    """CSV bytes for the export button; rebuilt only when the data version bumps.
+
+    Reads from the DB rather than session state, like _status_counts, so the
+    process-global cache never captures another session's in-memory records.
+    """
+    import pandas as pd  # deferred: keeps pandas off the cold-start path
+
+    df = pd.DataFrame.from_records(load_data(username), columns=JOB_COLUMNS)
+    return df.to_csv(index=False).encode()
+
+
+def append_row(username, row):
+    """Insert a single job application without touching existing rows."""
+    row = normalize_record(row)
+    conn = get_db()
+    with conn:
+        conn.execute(
+            "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+            (username, *(row[col] for col in JOB_COLUMNS))
+        )
 
 
 def login_page():
@@ -144,10 +282,21 @@ def login_page():
                 if login_btn:
                     if username and password:
                         users = load_users()
-                        if username in users and users[username]["password"] == hash_password(password):
+                        if username in users and verify_password(password, users[username]):
+                            if not users[username].salt:
+                                # Upgrade legacy SHA-256 records to scrypt in place
+                                salt = secrets.token_bytes(16)
+                                users[username] = replace(
+                                    users[username],
+                                    password=hash_password(password, salt),
+                                    salt=base64.b64encode(salt).decode()
+                                )
+                                save_users(users)
+                            # Don't keep derived credentials around once logged in
+                            _derive_scrypt.cache_clear()
                             st.session_state.logged_in = True
                             st.session_state.username = username
-                            st.session_state.display_name = users[username].get("display_name", username)
+                            st.session_state.display_name = users[username].display_name or username
                             st.success("✅ Login successful!")
                             st.rerun()
                         else:
@@ -175,11 +324,13 @@ def login_page():
                             if new_username in users:
                                 st.error("❌ Username already exists")
                             else:
-                                users[new_username] = {
-                                    "password": hash_password(new_password),
-                                    "display_name": new_display_name,
-                                    "created_at": datetime.now().isoformat()
-                                }
+                                salt = secrets.token_bytes(16)
+                                users[new_username] = User(
+                                    password=hash_password(new_password, salt),
+                                    salt=base64.b64encode(salt).decode(),
+                                    display_name=new_display_name,
+                                    created_at=time.time()
+                                )
                                 save_users(users)
                                 st.success("✅ Account created! Please login.")
                     else:
@@ -201,15 +352,18 @@ def main_app():
             st.session_state.logged_in = False
             st.session_state.username = None
             st.session_state.display_name = None
-            st.session_state.pop("jobs_df", None)
+            st.session_state.pop("jobs_records", None)
             st.rerun()
     
     st.markdown('<p class="sub-header">Keep track of all your job applications in one place</p>', unsafe_allow_html=True)
     
-    # Initialize session state for this user
-    if "jobs_df" not in st.session_state or st.session_state.get("current_user") != username:
-        st.session_state.jobs_df = load_data(username)
+    # Initialize session state for this user; every mutation bumps jobs_version,
+    # which is the explicit cache key for counts, search blobs and the CSV export
+    st.session_state.setdefault("jobs_version", 0)
+    if "jobs_records" not in st.session_state or st.session_state.get("current_user") != username:
+        st.session_state.jobs_records = load_data(username)
         st.session_state.current_user = username
+        st.session_state.jobs_version += 1
     
     # Sidebar for adding new applications
     with st.sidebar:
@@ -226,15 +380,16 @@ def main_app():
             
             if submitted:
                 if company_name and job_title:
-                    new_row = pd.DataFrame([{
+                    new_row = {
                         "Company Name": company_name,
                         "Job Title": job_title,
                         "Status": status,
-                        "Applied Date": applied_date,
+                        "Applied Date": applied_date.isoformat(),
                         "Package": package
-                    }])
-                    st.session_state.jobs_df = pd.concat([st.session_state.jobs_df, new_row], ignore_index=True)
-                    save_data(username, st.session_state.jobs_df)
+                    }
+                    st.session_state.jobs_records.append(new_row)
+                    st.session_state.jobs_version += 1
+                    append_row(username, new_row)
                     st.success("✅ Application added!")
                     st.rerun()
                 else:
@@ -242,76 +397,93 @@ def main_app():
     
     # Main content area
     st.divider()
-    
+
+    # Display statistics
+    col1, col2, col3, col4 = st.columns(4)
+
+    counts = _status_counts(username, st.session_state.jobs_version)
+    total_apps = sum(counts.values())
+    with col1:
+        st.metric("📊 Total Applications", total_apps)
+    with col2:
+        interview_count = counts.get("Interview Scheduled", 0) + counts.get("Interview Done", 0)
+        st.metric("🎯 Interviews", interview_count)
+    with col3:
+        offers = counts.get("Offer Received", 0)
+        st.metric("🎉 Offers", offers)
+    with col4:
+        pending = counts.get("Applied", 0)
+        st.metric("⏳ Pending", pending)
+
+    st.divider()
+
+    # Filters and table rerun on their own; typing in the search box
+    # doesn't re-execute the sidebar form or the metric strip
+    _filter_and_edit(username)
+
+    # Footer
+    st.divider()
+    st.markdown(
+        "<p style='text-align: center; color: #888;'>💡 Tip: Use the data editor above to edit or delete individual rows. "
+        "Click on a cell to edit, and use the row actions to delete.</p>",
+        unsafe_allow_html=True
+    )
+
+
+@st.fragment
+def _filter_and_edit(username):
+    """Filter inputs plus the editable table; only this block reruns on filter changes."""
     # Filters section
     st.subheader("🔍 Filter Applications")
-    
+
     col1, col2, col3 = st.columns([2, 1, 1])
-    
+
     with col1:
         search_query = st.text_input(
             "Search by Company or Job Title",
             placeholder="Type to search...",
             label_visibility="collapsed"
         )
-    
+
     with col2:
         status_filter = st.selectbox(
             "Filter by Status",
             ["All"] + STATUS_OPTIONS,
             label_visibility="collapsed"
         )
-    
+
     with col3:
         if st.button("🔄 Refresh Data", use_container_width=True):
-            st.session_state.jobs_df = load_data(username)
-            st.rerun()
-    
-    # Apply filters
-    filtered_df = st.session_state.jobs_df.copy()
-    
+            st.session_state.jobs_records = load_data(username)
+            st.session_state.jobs_version += 1
+            st.rerun(scope="app")
+
+    # Apply filters directly on the records; no DataFrame round-trip
+    filtered_records = st.session_state.jobs_records
     if search_query:
-        mask = (
-            filtered_df["Company Name"].str.contains(search_query, case=False, na=False) |
-            filtered_df["Job Title"].str.contains(search_query, case=False, na=False)
-        )
-        filtered_df = filtered_df[mask]
-    
+        q = search_query.lower()
+        blobs = _search_blobs()
+        filtered_records = [r for r, blob in zip(filtered_records, blobs) if q in blob]
     if status_filter != "All":
-        filtered_df = filtered_df[filtered_df["Status"] == status_filter]
-    
-    st.divider()
-    
-    # Display statistics
-    col1, col2, col3, col4 = st.columns(4)
-    
-    total_apps = len(st.session_state.jobs_df)
-    with col1:
-        st.metric("📊 Total Applications", total_apps)
-    with col2:
-        interview_count = len(st.session_state.jobs_df[st.session_state.jobs_df["Status"].str.contains("Interview", na=False)])
-        st.metric("🎯 Interviews", interview_count)
-    with col3:
-        offers = len(st.session_state.jobs_df[st.session_state.jobs_df["Status"] == "Offer Received"])
-        st.metric("🎉 Offers", offers)
-    with col4:
-        pending = len(st.session_state.jobs_df[st.session_state.jobs_df["Status"] == "Applied"])
-        st.metric("⏳ Pending", pending)
-    
+        filtered_records = [r for r in filtered_records if r["Status"] == status_filter]
+
     st.divider()
-    
+
     # Job applications table
     st.subheader("📋 Your Applications")
-    
-    if filtered_df.empty:
+
+    if not filtered_records:
         st.info("No job applications found. Add your first application using the sidebar!")
     else:
-        # Add index for selection
-        filtered_df_display = filtered_df.reset_index(drop=True)
-        
-        # Editable dataframe
-        edited_df = st.data_editor(
-            filtered_df_display,
+        # The editor needs real date objects for the DateColumn
+        display_rows = [
+            {**r, "Applied Date": display_date(r["Applied Date"])}
+            for r in filtered_records
+        ]
+
+        # Editable table
+        edited_rows = st.data_editor(
+            display_rows,
             column_config={
                 "Company Name": st.column_config.TextColumn(
                     "Company Name",
@@ -346,18 +518,33 @@ def main_app():
         )
         
         # Save changes button
-        col1, col2, col3 = st.columns([1, 1, 4])
-        
+        col1, col2, col3, col4 = st.columns([1, 1, 1, 3])
+
         with col1:
             if st.button("💾 Save Changes", type="primary", use_container_width=True):
-                st.session_state.jobs_df = edited_df.copy()
-                save_data(username, st.session_state.jobs_df)
-                st.success("✅ Changes saved successfully!")
-                st.rerun()
-        
+                records = [normalize_record(r) for r in edited_rows]
+                if any(not r.get("Company Name") or not r.get("Job Title") or not r.get("Status") for r in records):
+                    st.error("Please fill in Company Name, Job Title and Status for every row")
+                else:
+                    # Write first; session state only moves once the DB has the rows
+                    save_data(username, records)
+                    st.session_state.jobs_records = records
+                    st.session_state.jobs_version += 1
+                    st.success("✅ Changes saved successfully!")
+                    st.rerun(scope="app")
+
         with col2:
             if st.button("🗑️ Clear All", type="secondary", use_container_width=True):
                 st.session_state.show_confirm = True
+
+        with col3:
+            st.download_button(
+                "⬇️ Export CSV",
+                data=_export_csv(username, st.session_state.jobs_version),
+                file_name=f"job_applications_{username}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
         
         # Confirmation dialog for clearing all data
         if st.session_state.get("show_confirm", False):
@@ -365,26 +552,21 @@ def main_app():
             col_yes, col_no, _ = st.columns([1, 1, 4])
             with col_yes:
                 if st.button("Yes, Delete All", type="primary"):
-                    st.session_state.jobs_df = pd.DataFrame(columns=["Company Name", "Job Title", "Status", "Applied Date", "Package"])
-                    save_data(username, st.session_state.jobs_df)
+                    st.session_state.jobs_records = []
+                    st.session_state.jobs_version += 1
+                    clear_data(username)
                     st.session_state.show_confirm = False
-                    st.rerun()
+                    st.rerun(scope="app")
             with col_no:
                 if st.button("Cancel"):
                     st.session_state.show_confirm = False
                     st.rerun()
-    
-    # Footer
-    st.divider()
-    st.markdown(
-        "<p style='text-align: center; color: #888;'>💡 Tip: Use the data editor above to edit or delete individual rows. "
-        "Click on a cell to edit, and use the row actions to delete.</p>",
-        unsafe_allow_html=True
-    )
 
 
 def main():
     """Main entry point."""
+    _inject_css()
+
     # Initialize session state
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False